@@ -13,6 +13,7 @@ from collections import defaultdict
 import sqlite3  # Import SQLite module
 from datetime import datetime
 import random  # For randomly selecting a station
+from transcription import transcribe_audio_file  # Chunked parallel speech-to-text
 
 # 📌 Set page config as the FIRST Streamlit command
 st.set_page_config(page_title="Railway Complaint System", layout="wide")
@@ -21,6 +22,10 @@ st.set_page_config(page_title="Railway Complaint System", layout="wide")
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 model = genai.GenerativeModel('gemini-1.5-flash')
 
+# 📁 Local file locations (override with environment variables on other machines)
+DB_PATH = os.getenv("COMPLAINTS_DB_PATH", r"C:\Users\visma\Documents\complaints.db")
+LOGO_PATH = os.getenv("RAILWAY_LOGO_PATH", r"C:\Users\visma\Downloads\Indian_Railway_Logo_2.png")
+
 # 🔹 Define valid PNR numbers
 VALID_PNR_NUMBERS = {f"PNRA{i}" for i in range(1, 11)} | {f"PNRB{i}" for i in range(1, 11)}
 
@@ -117,8 +122,8 @@ LANGUAGE_PLACEHOLDERS = {
 
 # 🔧 SQLite Database Setup with Schema Migration
 def init_db():
-    # Connect to the database in the Documents folder
-    conn = sqlite3.connect(r"C:\Users\visma\Documents\complaints.db")
+    # Connect to the database (Documents folder by default)
+    conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
     # Check if the table exists
@@ -193,8 +198,8 @@ init_db()
 
 def save_to_db(complaint_data):
     try:
-        # Connect to the database in the Documents folder
-        conn = sqlite3.connect(r"C:\Users\visma\Documents\complaints.db")
+        # Connect to the database (Documents folder by default)
+        conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         c.execute('''
             INSERT INTO complaints (phone_number, pnr_number, complaint, category_subcategory, language, timestamp, station_name, station_phone)
@@ -219,7 +224,7 @@ def save_to_db(complaint_data):
 
 def read_from_db():
     try:
-        conn = sqlite3.connect(r"C:\Users\visma\Documents\complaints.db")
+        conn = sqlite3.connect(DB_PATH)
         df = pd.read_sql_query("SELECT * FROM complaints", conn)
         return df
     except Exception as e:
@@ -466,7 +471,7 @@ def set_styles():
 set_styles()
 
 # Sidebar setup
-st.sidebar.image(r"C:\Users\visma\Downloads\Indian_Railway_Logo_2.png", width=250)  # Logo in sidebar
+st.sidebar.image(LOGO_PATH, width=250)  # Logo in sidebar
 st.sidebar.title("📌 Navigation")
 menu = ["Home", "File a Complaint", "Admin Panel", "Help"]
 choice = st.sidebar.radio("Go to", menu)
@@ -476,6 +481,12 @@ if "audio_path" not in st.session_state:
     st.session_state["audio_path"] = None
 if "complaint_data" not in st.session_state:
     st.session_state["complaint_data"] = []
+if "uploaded_file_key" not in st.session_state:
+    st.session_state["uploaded_file_key"] = None  # file_id of the upload stored at audio_path
+if "transcript_key" not in st.session_state:
+    st.session_state["transcript_key"] = None  # (audio_path, language code) of the cached transcript
+if "transcript" not in st.session_state:
+    st.session_state["transcript"] = None
 
 # 📩 Submit Complaint (User Side)
 if choice == "File a Complaint":
@@ -516,30 +527,45 @@ if choice == "File a Complaint":
 
         with col2:
             uploaded_file = st.file_uploader("📂 Upload an Audio File", type=["wav", "mp3", "m4a"])
-            if uploaded_file:
+            if uploaded_file is None:
+                st.session_state["uploaded_file_key"] = None  # Uploader emptied
+            # Only store a new upload; the uploader returns the same file (same file_id) on every rerun,
+            # while every new upload, even of an identical file, gets a fresh file_id
+            elif st.session_state["uploaded_file_key"] != uploaded_file.file_id:
                 temp_audio_path = tempfile.NamedTemporaryFile(delete=False, suffix=".wav").name
                 with open(temp_audio_path, "wb") as f:
                     f.write(uploaded_file.read())
                 st.session_state["audio_path"] = temp_audio_path
+                st.session_state["uploaded_file_key"] = uploaded_file.file_id
+            if uploaded_file:
                 st.success("✅ File Uploaded Successfully.")
 
         if st.session_state["audio_path"]:
-            # Transcribe the audio
-            st.write("⏳ Transcribing Audio Complaint...")
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(st.session_state["audio_path"]) as source:
-                audio_data = recognizer.record(source)
-            try:
-                complaint_text = recognizer.recognize_google(audio_data, language=selected_lang_code)
-                st.success("✅ Transcription completed!")
-            except sr.UnknownValueError:
-                complaint_text = "❌ Could not understand the audio."
-                st.error(complaint_text)
-                st.stop()
-            except sr.RequestError:
-                complaint_text = "❌ Speech Recognition API unavailable."
-                st.error(complaint_text)
-                st.stop()
+            # Transcribe the audio only when the file or language changed since the last rerun
+            transcript_key = (st.session_state["audio_path"], selected_lang_code)
+            if st.session_state["transcript_key"] != transcript_key:
+                st.write("⏳ Transcribing Audio Complaint...")
+                progress_bar = st.progress(0.0)
+
+                def show_chunk_progress(idx, done, total):
+                    # Called from the main thread as each chunk finishes
+                    progress_bar.progress(done / total, text=f"Chunk {idx + 1} transcribed ({done}/{total})")
+
+                try:
+                    st.session_state["transcript"] = transcribe_audio_file(
+                        st.session_state["audio_path"], selected_lang_code, on_chunk_done=show_chunk_progress
+                    )
+                    st.session_state["transcript_key"] = transcript_key
+                except sr.UnknownValueError:
+                    complaint_text = "❌ Could not understand the audio."
+                    st.error(complaint_text)
+                    st.stop()
+                except sr.RequestError:
+                    complaint_text = "❌ Speech Recognition API unavailable."
+                    st.error(complaint_text)
+                    st.stop()
+            complaint_text = st.session_state["transcript"]
+            st.success("✅ Transcription completed!")
 
             # Show transcribed text with edit option
             st.write("🎤 Transcribed Complaint:")
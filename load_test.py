@@ -0,0 +1,487 @@
+"""Concurrent load simulator for the Railway Complaint System.
+
+Drives many simulated passenger and admin sessions through SQL1_AI.py with
+streamlit.testing.v1.AppTest, on the streamlit version pinned in
+requirements.txt. Like a deployed
+Streamlit server, every session in a process runs at the same time on its own
+thread; --processes > 1 models several server replicas sharing one database.
+Gemini, SMTP, the microphone and Google speech recognition are replaced with
+fakes that sleep for a configurable latency; SQLite is real and shared, so
+lock contention is measured as it would happen in a deployment. Every
+simulated choice and fake response derives from --seed; only thread timing
+varies between runs with the same seed.
+
+Example:
+    python load_test.py --passengers 200 --admins 10
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import smtplib
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+import traceback
+import types
+import wave
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Barrier, Pool
+
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SQL1_AI.py")
+ADMIN_PASSWORD = "admin123"
+
+# 🧪 Canned data for the simulated sessions
+SAMPLE_COMPLAINTS = [
+    "The toilet in coach B2 is very dirty and there are cockroaches everywhere",
+    "Someone is smoking in the compartment and the fans are not working",
+    "The vendor charged me double for a bottle of water",
+    "Staff behaved rudely when I asked about my berth",
+    "My bag was stolen while I was sleeping",
+]
+FAKE_AI_OUTPUTS = [
+    "COACH-CLEANLINESS - TOILETS, COACH-CLEANLINESS - COCKROACH",
+    "SECURITY - SMOKING, ELECTRICAL-EQUIPMENT - FANS",
+    "CATERING AND VENDING SERVICES - OVERCHARGING",
+    "STAFF BEHAVIOUR - STAFF – BEHAVIOUR",
+    "SECURITY - THEFT OF PASSENGERS' BELONGINGS",
+]
+LANGUAGES = ["English", "Hindi", "Tamil", "Bengali", "Kannada"]
+PNR_NUMBERS = [f"PNRA{i}" for i in range(1, 11)] + [f"PNRB{i}" for i in range(1, 11)]
+
+# 📊 Per-process SQLite counters, shared by every session thread in the process
+_sqlite_write_waits = []
+_sqlite_locked = []
+_start_barrier = None
+
+
+# 🔌 Fake backends
+class FakeGeminiResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return FakeGeminiResponse(FAKE_AI_OUTPUTS[zlib.crc32(prompt.encode()) % len(FAKE_AI_OUTPUTS)])
+
+
+class FakeSMTP:
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        time.sleep(self.latency)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, msg):
+        time.sleep(self.latency)
+
+    def quit(self):
+        pass
+
+
+def fake_recognize_google(self, audio_data, language=None, **kwargs):
+    time.sleep(fake_recognize_google.latency)
+    return SAMPLE_COMPLAINTS[zlib.crc32(audio_data.get_raw_data()) % len(SAMPLE_COMPLAINTS)]
+
+
+fake_recognize_google.latency = 0.0
+
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "ALTER", "DROP")
+
+
+class TimedCursor(sqlite3.Cursor):
+    # Time write statements only: that is where SQLite's busy handler waits for the write lock
+    def execute(self, sql, *args, **kwargs):
+        return _timed(super().execute, sql, *args, timed=sql.lstrip().upper().startswith(WRITE_STATEMENTS), **kwargs)
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args, **kwargs):
+        return self.cursor().execute(sql, *args, **kwargs)
+
+    def commit(self):
+        # A commit with no open transaction is a no-op and never waits
+        return _timed(super().commit, timed=self.in_transaction)
+
+
+def _timed(func, *args, timed=True, **kwargs):
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    except sqlite3.OperationalError as e:
+        if "locked" in str(e):
+            _sqlite_locked.append(str(e))
+        raise
+    finally:
+        if timed:
+            _sqlite_write_waits.append(time.perf_counter() - start)
+
+
+def write_placeholder_logo(path):
+    # Minimal 1x1 PNG so st.sidebar.image has a real file to load
+    def png_chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    pixels = zlib.compress(b"\x00\xff\xff\xff")
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", pixels) + png_chunk(b"IEND", b""))
+
+
+def make_apptest_thread_safe():
+    # AppTest sets and clears the global Runtime around every run, which breaks sessions running
+    # on other threads; give all of them one runtime, as in a real server process
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    # Compile the script once per process like the server does; every runner compiling its own copy
+    # at the same time also trips a CPython 3.11 AST bug under threads
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+    # AppTest reads the SHUTDOWN event right after the script stops; under load it can lag behind
+    LocalScriptRunner.script_stopped = lambda self: ScriptRunnerEvent.SHUTDOWN in self.events
+
+    # Setting widget values from session threads is expected here, not a bug worth a warning
+    logging.getLogger("streamlit.runtime.scriptrunner.script_run_context").setLevel(logging.ERROR)
+
+
+def write_long_upload(path, seconds, seed):
+    # Speech-like WAV: tone bursts of 2-8 s separated by short pauses, so it splits into several chunks
+    rate = 16000
+    rng = random.Random(seed)
+    parts = []
+    while sum(len(p) for p in parts) < seconds * rate:
+        parts.append((np.sin(np.arange(int(rng.uniform(2, 8) * rate)) * 0.1) * 8000).astype(np.int16))
+        parts.append(np.zeros(int(rng.uniform(0.3, 1.0) * rate), dtype=np.int16))
+    samples = np.concatenate(parts)[: seconds * rate]
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+
+
+def install_fakes(config, start_barrier):
+    # Runs once in every worker process before any session starts
+    import google.generativeai as genai
+    import speech_recognition as sr
+
+    global _start_barrier
+    _start_barrier = start_barrier
+    random.seed(config["seed"])  # Station assignment in the app
+    make_apptest_thread_safe()
+
+    os.environ["COMPLAINTS_DB_PATH"] = config["db_path"]
+    os.environ["RAILWAY_LOGO_PATH"] = config["logo_path"]
+
+    FakeGenerativeModel.latency = config["gemini_latency"]
+    genai.configure = lambda *args, **kwargs: None
+    genai.GenerativeModel = FakeGenerativeModel
+
+    FakeSMTP.latency = config["smtp_latency"]
+    smtplib.SMTP = FakeSMTP
+
+    fake_recognize_google.latency = config["recognizer_latency"]
+    sr.Recognizer.recognize_google = fake_recognize_google
+
+    sounddevice = types.ModuleType("sounddevice")
+    sounddevice.rec = lambda frames, samplerate, channels, dtype: np.zeros((frames, channels), dtype=dtype)
+    sounddevice.wait = lambda: None
+    sys.modules["sounddevice"] = sounddevice
+
+    connect = sqlite3.connect
+    sqlite3.connect = lambda *args, **kwargs: connect(*args, factory=TimedConnection, **kwargs)
+
+
+# 🚶 Simulated sessions
+def timed_step(at, step, timings, errors, expected_error=None):
+    # Run one script rerun and record its latency and any failure under the step name.
+    # The app reports most failures with st.error and carries on, so those count too.
+    start = time.perf_counter()
+    try:
+        at.run()
+    except Exception as e:
+        errors[step].append(f"{type(e).__name__}: {e}")
+    timings[step].append(time.perf_counter() - start)
+    for exc in at.exception:
+        errors[step].append(exc.value)
+    for error in at.error:
+        if not (expected_error and expected_error in error.value):
+            errors[step].append(error.value)
+
+
+def open_page(at, page, timings, errors, expected_error=None):
+    at.sidebar.radio[0].set_value(page)
+    timed_step(at, page, timings, errors, expected_error)
+
+
+def find_button(at, label_prefix):
+    return next(b for b in at.button if b.label.startswith(label_prefix))
+
+
+def passenger_session(at, session_id, rng, timings, errors, upload_path):
+    # Passengers rotate between typed, recorded (10 s, one chunk) and uploaded long audio (many chunks)
+    timed_step(at, "Home", timings, errors)
+    open_page(at, "File a Complaint", timings, errors)
+    at.text_input[0].input(f"98{session_id:08d}")
+    at.text_input[1].input(rng.choice(PNR_NUMBERS))
+    at.selectbox[0].set_value(rng.choice(LANGUAGES))
+    input_method = next(r for r in at.radio if r.label == "Select Input Method")
+    scenario = session_id % 3
+
+    if scenario == 0:
+        input_method.set_value("Type Complaint")
+        timed_step(at, "Select Input Method", timings, errors)
+        at.text_area[0].input(rng.choice(SAMPLE_COMPLAINTS))
+        at.button(key="submit_typed").click()
+        timed_step(at, "Submit Typed Complaint", timings, errors)
+        return
+
+    input_method.set_value("Record/Upload Audio")
+    timed_step(at, "Select Input Method", timings, errors)
+    if scenario == 1:
+        find_button(at, "🎙 Start Recording").click()
+        timed_step(at, "Record + Transcribe Audio", timings, errors)
+    else:
+        # AppTest cannot drive st.file_uploader, so hand the app the stored upload it would have written
+        at.session_state["audio_path"] = upload_path
+        timed_step(at, "Upload + Transcribe Long Audio", timings, errors)
+    at.button(key="submit_audio").click()
+    timed_step(at, "Submit Audio Complaint", timings, errors)
+
+
+def admin_session(at, session_id, rng, timings, errors, complaints_per_admin):
+    # Pending complaints live in each browser session, so the admin session is seeded directly
+    at.session_state["complaint_data"] = [
+        {
+            "phone_number": f"97{session_id:04d}{n:04d}",
+            "pnr_number": rng.choice(PNR_NUMBERS),
+            "complaint_text": rng.choice(SAMPLE_COMPLAINTS),
+            "language_code": "en-IN",
+            "input_type": "text",
+            "language": "English",
+        }
+        for n in range(complaints_per_admin)
+    ]
+    timed_step(at, "Home", timings, errors)
+    open_page(at, "Admin Panel", timings, errors, expected_error="Incorrect password")  # Not logged in yet
+    at.text_input[0].input(ADMIN_PASSWORD)
+    timed_step(at, "Admin Login", timings, errors)  # Logged in: lists pending complaints and reads the whole DB
+    for _ in range(complaints_per_admin):
+        at.button(key="process_0").click()
+        timed_step(at, "Process Complaint", timings, errors)
+
+
+def run_session(role, session_id, config):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(f"{config['seed']}-{role}-{session_id}")
+    timings = defaultdict(list)
+    errors = defaultdict(list)
+    started = time.time()
+
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=config["script_timeout"])
+        if role == "passenger":
+            passenger_session(at, session_id, rng, timings, errors, config["upload_path"])
+        else:
+            admin_session(at, session_id, rng, timings, errors, config["complaints_per_admin"])
+    except Exception:
+        errors["Session"].append(traceback.format_exc(limit=1).strip().splitlines()[-1])
+
+    return {
+        "role": role,
+        "timings": dict(timings),
+        "errors": dict(errors),
+        "started": started,
+        "finished": time.time(),
+    }
+
+
+def run_batch(batch):
+    # Run every session of this worker at once, one thread each, after all workers are ready
+    main_module = sys.modules["__main__"]
+    _sqlite_write_waits.clear()
+    _sqlite_locked.clear()
+    _start_barrier.wait()
+
+    with ThreadPoolExecutor(max_workers=len(batch)) as executor:
+        sessions = list(executor.map(lambda task: run_session(*task), batch))
+
+    # AppTest installs the app script as __main__; put ours back so the pool can pickle the result
+    sys.modules["__main__"] = main_module
+    return {"sessions": sessions, "sqlite_write_waits": list(_sqlite_write_waits), "sqlite_locked": len(_sqlite_locked)}
+
+
+# 📈 Reporting
+def percentiles(values):
+    if not values:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(max(values))}
+
+
+def peak_concurrency(sessions):
+    # Most sessions that were in progress at the same instant
+    events = [(s["started"], 1) for s in sessions] + [(s["finished"], -1) for s in sessions]
+    active = peak = 0
+    for _, change in sorted(events):
+        active += change
+        peak = max(peak, active)
+    return peak
+
+
+def build_report(batches):
+    timings = defaultdict(list)
+    errors = defaultdict(list)
+    sqlite_write_waits = []
+    sqlite_locked = 0
+    sessions = [session for batch in batches for session in batch["sessions"]]
+    for session in sessions:
+        for step, values in session["timings"].items():
+            timings[step].extend(values)
+        for step, messages in session["errors"].items():
+            errors[step].extend(messages)
+    for batch in batches:
+        sqlite_write_waits.extend(batch["sqlite_write_waits"])
+        sqlite_locked += batch["sqlite_locked"]
+
+    return {
+        "sessions": len(sessions),
+        "processes": len(batches),
+        "peak_concurrent_sessions": peak_concurrency(sessions),
+        "wall_time": max(s["finished"] for s in sessions) - min(s["started"] for s in sessions),
+        "steps": {
+            step: dict(percentiles(values), errors=len(errors.get(step, [])))
+            for step, values in timings.items()
+        },
+        "session_errors": len(errors.get("Session", [])),
+        "sqlite_writes": dict(
+            percentiles(sqlite_write_waits), total_time=float(sum(sqlite_write_waits)), locked_errors=sqlite_locked
+        ),
+        "sample_errors": sorted({str(m) for messages in errors.values() for m in messages})[:10],
+    }
+
+
+def print_report(report):
+    print(
+        f"\n🚆 {report['sessions']} sessions in {report['wall_time']:.1f}s across {report['processes']} process(es), "
+        f"peak {report['peak_concurrent_sessions']} concurrent"
+    )
+    print(f"\n{'Step':<34}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'errors':>8}")
+    for step, stats in report["steps"].items():
+        print(
+            f"{step:<34}{stats['count']:>7}{stats['p50']:>9.3f}{stats['p95']:>9.3f}"
+            f"{stats['p99']:>9.3f}{stats['max']:>9.3f}{stats['errors']:>8}"
+        )
+    sqlite_stats = report["sqlite_writes"]
+    print(
+        f"\n🗄 SQLite writes + commits (time includes waiting for the write lock): {sqlite_stats['count']} calls, "
+        f"p50 {sqlite_stats['p50']:.4f}s, p95 {sqlite_stats['p95']:.4f}s, p99 {sqlite_stats['p99']:.4f}s, "
+        f"max {sqlite_stats['max']:.4f}s, total {sqlite_stats['total_time']:.2f}s"
+    )
+    print(f"🔒 'database is locked' errors (any statement): {sqlite_stats['locked_errors']}")
+    print(f"❌ Session crashes: {report['session_errors']}")
+    for message in report["sample_errors"]:
+        print(f"   - {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent passenger and admin sessions against SQL1_AI.py")
+    parser.add_argument("--passengers", type=int, default=200, help="Number of passenger sessions")
+    parser.add_argument("--admins", type=int, default=10, help="Number of admin sessions")
+    parser.add_argument("--complaints-per-admin", type=int, default=5, help="Pending complaints each admin processes")
+    parser.add_argument(
+        "--processes", type=int, default=1, help="Server processes; sessions are split evenly and all run at once"
+    )
+    parser.add_argument("--gemini-latency", type=float, default=0.8, help="Fake Gemini response time (seconds)")
+    parser.add_argument("--smtp-latency", type=float, default=0.3, help="Fake SMTP connect/send time (seconds)")
+    parser.add_argument("--recognizer-latency", type=float, default=1.0, help="Fake recognize_google time per chunk (seconds)")
+    parser.add_argument("--upload-seconds", type=int, default=180, help="Length of the uploaded long audio complaint")
+    parser.add_argument("--script-timeout", type=float, default=120, help="Max seconds for a single script rerun")
+    parser.add_argument("--seed", type=int, help="Seed for every simulated choice (default: random, printed)")
+    parser.add_argument("--db", help="SQLite file to use (default: fresh temporary file)")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+    if args.seed is None:
+        args.seed = random.randrange(2 ** 32)
+
+    work_dir = tempfile.mkdtemp(prefix="railway_load_")
+    config = {
+        "db_path": args.db or os.path.join(work_dir, "complaints.db"),
+        "logo_path": os.path.join(work_dir, "logo.png"),
+        "upload_path": os.path.join(work_dir, "long_complaint.wav"),
+        "gemini_latency": args.gemini_latency,
+        "smtp_latency": args.smtp_latency,
+        "recognizer_latency": args.recognizer_latency,
+        "script_timeout": args.script_timeout,
+        "complaints_per_admin": args.complaints_per_admin,
+        "seed": args.seed,
+    }
+    write_placeholder_logo(config["logo_path"])
+    write_long_upload(config["upload_path"], args.upload_seconds, args.seed)
+
+    tasks = [("passenger", i, config) for i in range(args.passengers)]
+    tasks += [("admin", i, config) for i in range(args.admins)]
+    random.Random(args.seed).shuffle(tasks)
+    processes = max(1, min(args.processes, len(tasks)))
+    batches = [tasks[i::processes] for i in range(processes)]
+
+    # One batch per process; the barrier releases them together once every process has started
+    start_barrier = Barrier(processes)
+    try:
+        with Pool(processes=processes, initializer=install_fakes, initargs=(config, start_barrier)) as pool:
+            print(f"⏳ Running {len(tasks)} sessions in {processes} process(es) with --seed {args.seed}...", flush=True)
+            results = pool.map(run_batch, batches, chunksize=1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    report = build_report(results)
+    report["seed"] = args.seed
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
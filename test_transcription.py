@@ -0,0 +1,139 @@
+import time
+import wave
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+
+import transcription
+
+RATE = 8000
+SPEECH_SECONDS = 9
+PAUSE_SECONDS = 1
+
+
+class FakeRecognizer(sr.Recognizer):
+    # Names every speech segment in a chunk by its loudness; later chunks answer first
+    def __init__(self, fail_with=None, fail_after=0):
+        super().__init__()
+        self.fail_with = fail_with
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def recognize_google(self, audio_data, language=None, **kwargs):
+        self.calls += 1
+        if self.fail_with:
+            time.sleep(self.fail_after)
+            raise self.fail_with()
+        samples = np.frombuffer(audio_data.get_raw_data(), dtype=np.int16)
+        segments = []
+        for second in samples[: len(samples) - len(samples) % RATE].reshape(-1, RATE):
+            peak = int(np.abs(second).max())
+            if peak and (not segments or segments[-1] != peak // 1000 - 1):
+                segments.append(peak // 1000 - 1)
+        time.sleep(0.02 * (10 - segments[0]) if segments else 0)
+        return " ".join(f"segment{k}" for k in segments)
+
+
+def make_speech(segments, levels=None):
+    # Alternate segments of loud tone (louder for each segment unless levels are given) with silent pauses
+    parts = []
+    for k in (levels or range(segments)):
+        tone = np.sin(np.arange(SPEECH_SECONDS * RATE)) * 1000 * (k + 1)
+        parts.append(np.round(tone).astype(np.int16))
+        parts.append(np.zeros(PAUSE_SECONDS * RATE, dtype=np.int16))
+    return np.concatenate(parts)
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(samples.tobytes())
+    return str(path)
+
+
+def test_chunks_are_transcribed_and_reassembled_in_order(tmp_path):
+    path = write_wav(tmp_path / "long.wav", make_speech(10))
+    progress = []
+
+    text = transcription.transcribe_audio_file(
+        path, "en-IN", recognizer=FakeRecognizer(), on_chunk_done=lambda *args: progress.append(args)
+    )
+
+    assert text == " ".join(f"segment{k}" for k in range(10))
+    finished = [idx for idx, _, _ in progress]
+    assert sorted(finished) == list(range(len(progress)))
+    assert finished != sorted(finished)  # Later chunks finished first, yet the text is in order
+    assert [done for _, done, _ in progress] == list(range(1, len(progress) + 1))
+    assert len(progress) > 1
+
+
+def test_cuts_land_in_silence():
+    samples = make_speech(10)
+    chunks, silent_cuts = transcription.split_audio_on_silence(sr.AudioData(samples.tobytes(), RATE, 2))
+
+    assert len(chunks) > 1
+    assert silent_cuts == [True] * (len(chunks) - 1)
+    assert b"".join(chunk.get_raw_data() for chunk in chunks) == samples.tobytes()  # No overlap in silence
+    cut = 0
+    for chunk in chunks[:-1]:
+        length = len(chunk.get_raw_data()) // 2
+        assert transcription.CHUNK_MIN_SECONDS * RATE <= length <= transcription.CHUNK_MAX_SECONDS * RATE
+        cut += length
+        assert not samples[cut - RATE // 20 : cut + RATE // 20].any()
+
+
+def test_words_repeated_across_a_padded_cut_are_joined_once():
+    text = transcription.join_chunk_texts(["the fan is not", "Not working in", "in coach B2"], [False, False])
+
+    assert text == "the fan is not working in coach B2"
+
+
+def test_words_repeated_across_a_silent_cut_are_kept():
+    text = transcription.join_chunk_texts(["it is very dirty", "", "Dirty water is leaking"], [True, False])
+
+    assert text == "it is very dirty Dirty water is leaking"
+
+
+def test_speech_repeated_across_a_silent_cut_is_transcribed_twice(tmp_path):
+    # The 3rd and 4th segments sound alike and the first cut falls in the pause between them
+    path = write_wav(tmp_path / "repeat.wav", make_speech(10, levels=[0, 1, 2, 2, 3, 4, 5, 6, 7, 8]))
+
+    text = transcription.transcribe_audio_file(path, "en-IN", recognizer=FakeRecognizer())
+
+    assert text == "segment0 segment1 segment2 segment2 segment3 segment4 segment5 segment6 segment7 segment8"
+
+
+def test_all_silent_chunks_raise_unknown_value(tmp_path):
+    path = write_wav(tmp_path / "silent.wav", np.zeros(100 * RATE, dtype=np.int16))
+    recognizer = FakeRecognizer(fail_with=sr.UnknownValueError)
+
+    with pytest.raises(sr.UnknownValueError):
+        transcription.transcribe_audio_file(path, "en-IN", recognizer=recognizer)
+    assert recognizer.calls > 1
+
+
+def test_request_error_cancels_queued_chunks(tmp_path):
+    path = write_wav(tmp_path / "long.wav", make_speech(60))
+    recognizer = FakeRecognizer(fail_with=sr.RequestError, fail_after=0.2)
+
+    start = time.perf_counter()
+    with pytest.raises(sr.RequestError):
+        transcription.transcribe_audio_file(path, "en-IN", recognizer=recognizer)
+
+    assert time.perf_counter() - start < 0.4  # One request timeout, not one per queued chunk
+    assert recognizer.calls <= 2 * transcription.TRANSCRIPTION_WORKERS
+
+
+def test_short_file_is_a_single_chunk(tmp_path):
+    samples = make_speech(4)
+    assert len(samples) == transcription.CHUNK_MAX_SECONDS * RATE
+    path = write_wav(tmp_path / "short.wav", samples)
+    recognizer = FakeRecognizer()
+
+    text = transcription.transcribe_audio_file(path, "en-IN", recognizer=recognizer)
+
+    assert text == "segment0 segment1 segment2 segment3"
+    assert recognizer.calls == 1
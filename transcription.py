@@ -0,0 +1,113 @@
+import numpy as np
+import speech_recognition as sr
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 🎧 Long audio transcription settings (chunks are cut at the quietest point in each window)
+CHUNK_MIN_SECONDS = 20  # Earliest point a chunk may be cut
+CHUNK_MAX_SECONDS = 40  # Latest point a chunk may be cut
+CHUNK_OVERLAP_SECONDS = 0.3  # Padding shared by neighbouring chunks around a cut that is not in silence
+SILENCE_WINDOW_SECONDS = 0.05  # Window size used to measure loudness
+SILENCE_THRESHOLD_RATIO = 0.1  # A window quieter than this fraction of the average loudness is silence
+BOUNDARY_DUPLICATE_WORDS = 3  # Max words repeated across an overlapping cut that are dropped when joining
+TRANSCRIPTION_WORKERS = 4  # Max concurrent recognize_google calls
+
+
+def split_audio_on_silence(audio_data):
+    # Split AudioData into chunks, cutting at the quietest window between CHUNK_MIN and CHUNK_MAX seconds.
+    # Cuts in silence are clean; other cuts get CHUNK_OVERLAP_SECONDS of padding so no word is lost.
+    # Returns the chunks and, for each cut between neighbouring chunks, whether it was in silence.
+    sample_rate = audio_data.sample_rate
+    raw = audio_data.get_raw_data(convert_width=2)
+    samples = np.frombuffer(raw, dtype=np.int16)
+    total = len(samples)
+    max_len = int(CHUNK_MAX_SECONDS * sample_rate)
+    if total <= max_len:
+        return [sr.AudioData(raw, sample_rate, 2)], []
+
+    window = max(1, int(SILENCE_WINDOW_SECONDS * sample_rate))
+    overlap = int(CHUNK_OVERLAP_SECONDS * sample_rate)
+    min_len = int(CHUNK_MIN_SECONDS * sample_rate)
+
+    # Loudness (RMS) of each window across the whole file
+    usable = total - total % window
+    frames = samples[:usable].astype(np.float64).reshape(-1, window)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    silence_threshold = SILENCE_THRESHOLD_RATIO * rms.mean()
+
+    cuts = []  # (sample index, cut is in silence)
+    start = 0
+    while total - start > max_len:
+        first = (start + min_len) // window
+        last = (start + max_len) // window
+        quietest = first + int(np.argmin(rms[first:last]))
+        silent = rms[quietest] <= silence_threshold
+        end = quietest + 1
+        while silent and end < last and rms[end] <= silence_threshold:
+            end += 1  # Cut in the middle of the pause, away from the surrounding speech
+        cut = (quietest + end) * window // 2
+        cuts.append((cut, silent))
+        start = cut
+
+    bounds = [(0, True)] + cuts + [(total, True)]
+    chunks = []
+    for (begin, begin_silent), (end, end_silent) in zip(bounds[:-1], bounds[1:]):
+        begin = begin if begin_silent else max(0, begin - overlap)
+        end = end if end_silent else min(total, end + overlap)
+        chunks.append(sr.AudioData(samples[begin:end].tobytes(), sample_rate, 2))
+    return chunks, [silent for _, silent in cuts]
+
+
+def join_chunk_texts(texts, silent_cuts):
+    # Join chunk transcripts in order, dropping words repeated across a padded (non-silent) cut.
+    # Neighbours of a silent cut share no audio, so a repeat there is real speech and is kept.
+    words = []
+    previous_count = 0  # Words contributed by the chunk just before this one
+    for idx, text in enumerate(texts):
+        new_words = text.split()
+        if idx and not silent_cuts[idx - 1]:
+            for size in range(min(BOUNDARY_DUPLICATE_WORDS, previous_count, len(new_words)), 0, -1):
+                if [w.lower() for w in words[-size:]] == [w.lower() for w in new_words[:size]]:
+                    new_words = new_words[size:]
+                    break
+        words.extend(new_words)
+        previous_count = len(new_words)
+    return " ".join(words)
+
+
+def transcribe_chunk(recognizer, chunk, language_code):
+    # Transcribe a single chunk; a chunk with no recognisable speech yields an empty string
+    try:
+        return recognizer.recognize_google(chunk, language=language_code)
+    except sr.UnknownValueError:
+        return ""
+
+
+def transcribe_audio_file(audio_path, language_code, recognizer=None, on_chunk_done=None):
+    # Transcribe an audio file chunk by chunk in parallel and join the results in order
+    recognizer = recognizer or sr.Recognizer()
+    with sr.AudioFile(audio_path) as source:
+        audio_data = recognizer.record(source)
+    chunks, silent_cuts = split_audio_on_silence(audio_data)
+
+    texts = [""] * len(chunks)
+    executor = ThreadPoolExecutor(max_workers=min(TRANSCRIPTION_WORKERS, len(chunks)))
+    try:
+        futures = {
+            executor.submit(transcribe_chunk, recognizer, chunk, language_code): idx
+            for idx, chunk in enumerate(chunks)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            idx = futures[future]
+            texts[idx] = future.result()  # Re-raises sr.RequestError from the worker
+            if on_chunk_done:
+                on_chunk_done(idx, done, len(chunks))
+    except BaseException:
+        # Fail fast: drop queued chunks and don't wait for the ones still in flight
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    complaint_text = join_chunk_texts(texts, silent_cuts)
+    if not complaint_text:
+        raise sr.UnknownValueError()
+    return complaint_text